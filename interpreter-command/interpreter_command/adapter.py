@@ -2,7 +2,7 @@ import ailangpy
 import commands2
 
 from enum import Enum, auto
-from typing import Callable, Any
+from typing import Callable, Any, Sequence
 
 
 
@@ -26,22 +26,31 @@ def define_syntax(syntax: str) -> Callable[[list[ailangpy.Arg]], None]:
     require a non-trivial description language).
     """
     parts = syntax.split()
-    params = [None if part == "*" else part for part in parts]
-
-    def check(args: list[ailangpy.Arg]):
-        assert len(params) == len(args), f"Incorrect argument count (Expected {len(params)}, got {len(args)})"
-        for (i, (param, arg)) in enumerate(zip(params, args)):
-            if arg.is_value():
-                assert param is not None, f"Expected argument {i+1} to be a value"
-            else: # word
-                assert arg.matches_word(param), f"Expected argument {i+1} to be the word '{param}'"
+    # Stored as parallel arrays: `mask` flags the slots that must be values, and `words` holds the
+    # word each remaining slot must match (empty for value slots).
+    mask = bytes(1 if part == "*" else 0 for part in parts)
+    words = tuple("" if part == "*" else part for part in parts)
+
+    # The defaults bind the arrays and their length as locals, and the error messages are only
+    # formatted once a check has actually failed.
+    def check(args: list[ailangpy.Arg], _mask: bytes = mask, _words: tuple[str, ...] = words, _n: int = len(mask)):
+        if len(args) != _n:
+            raise AssertionError(f"Incorrect argument count (Expected {_n}, got {len(args)})")
+        for i in range(_n):
+            arg = args[i]
+            if _mask[i]:
+                if not arg.is_value():
+                    raise AssertionError(f"Expected argument {i+1} to be a value")
+            elif not arg.matches_word(_words[i]):
+                raise AssertionError(f"Expected argument {i+1} to be the word '{_words[i]}'")
 
     return check
 
 def no_args() -> Callable[[list[ailangpy.Arg]], None]:
     """Generates a syntax checker that checks that no arguments were passed of any kind."""
     def check(args: list[ailangpy.Arg]):
-        assert len(args) == 0
+        if args:
+            raise AssertionError(f"Expected no arguments, got {len(args)}")
     return check
 
 def simple_args(arg_count: int) -> Callable[[list[ailangpy.Arg]], None]:
@@ -49,10 +58,12 @@ def simple_args(arg_count: int) -> Callable[[list[ailangpy.Arg]], None]:
     Generates a syntax checker that simply checks if there are `arg_count` arguments and that they are all values.
     Fails if any arguments that are words.
     """
-    def check(args: list[ailangpy.Arg]):
-        value_args = len([arg for arg in args if arg.is_value()])
-        assert len(args) == value_args, "Expected only value arguments but found a word"
-        assert len(args) == arg_count, f"Expected {arg_count} arguments, got {len(args)}"
+    def check(args: list[ailangpy.Arg], _n: int = arg_count):
+        if len(args) != _n:
+            raise AssertionError(f"Expected {_n} arguments, got {len(args)}")
+        for arg in args:
+            if not arg.is_value():
+                raise AssertionError("Expected only value arguments but found a word")
 
     return check
 
@@ -66,12 +77,30 @@ def reset_usage_mark(self: commands2.Subsystem):
     self._ai_has_marked_this_iteration = False
 
 def has_been_marked(self: commands2.Subsystem) -> bool:
+    """
+    Whether an Ai call has used this subsystem since its mark was last reset. While an `AiCommand` is
+    running, only subsystems with a default command are reset every tick; the marks of the rest stay
+    set until the `AiCommand` ends.
+    """
     return hasattr(self, "_ai_has_marked_this_iteration") and self._ai_has_marked_this_iteration
 
+def pop_usage_mark(self: commands2.Subsystem) -> bool:
+    """Equivalent to `has_been_marked` followed by `reset_usage_mark`, but in a single call."""
+    marked = has_been_marked(self)
+    self._ai_has_marked_this_iteration = False
+    return marked
+
 
 commands2.Subsystem.mark_used = mark_used
 commands2.Subsystem.reset_usage_mark = reset_usage_mark
 commands2.Subsystem.has_been_marked = has_been_marked
+commands2.Subsystem.pop_usage_mark = pop_usage_mark
+
+# States of a `GeneratedCommandAdapter`. These are checked on every tick, so they're plain ints
+# rather than members of `CommandAdapter.CommandState`.
+_INACTIVE = 0
+_ACTIVE = 1
+_COMPLETE = 2
 
 class CommandAdapter(ailangpy.CallableGenerator):
     """
@@ -88,11 +117,14 @@ class CommandAdapter(ailangpy.CallableGenerator):
     """
     command_class: type[commands2.Command]
     checker: Callable[[list[ailangpy.Arg]], None]
-    default_args: list[Any]
+    default_args: tuple[Any, ...]
 
     class CommandState(Enum):
         """Internal type that represents the current state of a `GeneratedCommandAdapter`. You should never
-        need to use this directly."""
+        need to use this directly.
+
+        Deprecated: `GeneratedCommandAdapter` now tracks its state with module-level integer constants, so
+        this is no longer used internally. It is kept only for compatibility with code that referenced it."""
         Inactive = auto()
         Active = auto()
         Complete = auto()
@@ -101,35 +133,51 @@ class CommandAdapter(ailangpy.CallableGenerator):
         """Internal type that adapts a `Command` into a `Callable`, using the `Command`'s lifecycle methods.
         You should never create an instance of this yourself, since it is only meant to be used inside the Ai
         Interpreter."""
+        # A new instance is created for every native call, so skip the per-instance __dict__
+        __slots__ = ("command", "_state", "_init", "_exec", "_fin", "_end", "_marks")
+
         command: commands2.Command
-        _state: "CommandAdapter.CommandState"
+        _state: int
+        _init: Callable[[], None]
+        _exec: Callable[[], None]
+        _fin: Callable[[], bool]
+        _end: Callable[[bool], None]
+        _marks: tuple[Callable[[], None], ...]
 
         def __init__(self, command: commands2.Command):
             self.command = command
-            self._state = CommandAdapter.CommandState.Inactive
+            # The lifecycle methods are bound once here, instead of being looked up on every tick
+            self._init = command.initialize
+            self._exec = command.execute
+            self._fin = command.isFinished
+            self._end = command.end
+            # Requirements are fixed once a command is constructed, so the subsystems' usage markers
+            # can be bound ahead of time as well
+            self._marks = tuple(sub.mark_used for sub in command.getRequirements())
+            self._state = _INACTIVE
 
         def call(self) -> bool:
-            if self._state == CommandAdapter.CommandState.Inactive:
-                self.command.initialize()
-                self._state = CommandAdapter.CommandState.Active
-            self.command.execute()
+            if self._state == _INACTIVE:
+                self._init()
+                self._state = _ACTIVE
+            self._exec()
 
-            for sub in self.command.getRequirements():
-                sub.mark_used()
+            for mark in self._marks:
+                mark()
 
-            if self.command.isFinished():
-                self.command.end(False)
-                self._state = CommandAdapter.CommandState.Complete
+            if self._fin():
+                self._end(False)
+                self._state = _COMPLETE
                 return True
             return False
 
         def terminate(self):
-            if self._state == CommandAdapter.CommandState.Active:
-                self.command.end(True)
-                self._state = CommandAdapter.CommandState.Complete
+            if self._state == _ACTIVE:
+                self._end(True)
+                self._state = _COMPLETE
 
 
-    def __init__(self, command: type[commands2.Command], checker: Callable[[list[ailangpy.Arg]], None], default_args: list[Any] = []):
+    def __init__(self, command: type[commands2.Command], checker: Callable[[list[ailangpy.Arg]], None], default_args: Sequence[Any] = ()):
         """
         Creates a new instance of `CommandAdapter`, which wraps the given command type, and uses the given checker as the 
         `check_syntax` method. 
@@ -140,23 +188,23 @@ class CommandAdapter(ailangpy.CallableGenerator):
         """
         self.command_class = command
         self.checker = checker
-        self.default_args = default_args
+        self.default_args = tuple(default_args)
 
     def generate(self, args: list[Any]) -> "CommandAdapter.GeneratedCommandAdapter":
-        cmd = self.command_class(*self.default_args, *args)
-        return CommandAdapter.GeneratedCommandAdapter(cmd)
+        return CommandAdapter.GeneratedCommandAdapter(self.command_class(*self.default_args, *args))
 
     def check_syntax(self, args: list[ailangpy.Arg]):
         self.checker(args)
 
-def register_command(self: ailangpy.Interpreter | ailangpy.Compiler, name: str, command: type[commands2.Command], checker: Callable[[list[ailangpy.Arg]], None], default_args: list[Any] = []):
+def register_command(self: ailangpy.Interpreter | ailangpy.Compiler, name: str, command: type[commands2.Command], checker: Callable[[list[ailangpy.Arg]], None], default_args: Sequence[Any] = ()):
     """
     Registers a Command with the given Interpreter instance, automatically wrapping it in the adapter. This method is
     monkey-patched into the actual Interpreter class, so there's no need to import it directly, so long as you import
     the interpreter_command module
     """
-    adapter = CommandAdapter(command, checker, default_args)
-    self.register_callable(name, adapter)
+    # ailangpy has no native entry point that builds the adapter itself, so this stays a thin
+    # Python wrapper around `register_callable`.
+    self.register_callable(name, CommandAdapter(command, checker, default_args))
 
 
 ailangpy.Interpreter.register_command = register_command
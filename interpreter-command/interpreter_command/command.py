@@ -2,7 +2,7 @@ import ailangpy
 import commands2
 from . import adapter
 
-from typing import Optional
+from typing import Callable
 
 class AiCommand(commands2.Command):
     """
@@ -14,31 +14,47 @@ class AiCommand(commands2.Command):
     """
     terp: ailangpy.Interpreter
     complete: bool
+    subsystems: tuple[commands2.Subsystem, ...]
+    _default_commands: tuple[commands2.Command, ...]
+    _active_defaults: tuple[tuple[Callable[[], bool], Callable[[], None]], ...]
 
     def __init__(self, interpreter: ailangpy.Interpreter, *subsystems: commands2.Subsystem):
         super().__init__()
         self.terp = interpreter
         self.subsystems = subsystems
+        # Filled in by `initialize`; empty until then so `execute`/`end` are safe to call early
+        self._default_commands = ()
+        self._active_defaults = ()
         self.addRequirements(*subsystems)
 
     def initialize(self):
         self.complete = False
         #print("initializing AiCommand")
+        # Default commands are resolved once per run, rather than on every tick. Changing a default
+        # command while this command is running won't take effect until it is rescheduled.
+        defaults: list[tuple[commands2.Subsystem, commands2.Command]] = []
         for sub in self.subsystems:
+            # These methods are guaranteed to be here, since we import adapter above.
+            # Marks are cleared here and in `end`; while running, only subsystems with a default
+            # command are reset every tick.
+            sub.reset_usage_mark()
             cmd = sub.getDefaultCommand()
             if cmd is not None:
-                cmd.initialize()
+                defaults.append((sub, cmd))
+        # Only subsystems that actually have a default command need to be visited each tick, so the
+        # methods used there are bound up front.
+        self._default_commands = tuple(cmd for _, cmd in defaults)
+        self._active_defaults = tuple((sub.pop_usage_mark, cmd.execute) for sub, cmd in defaults)
+        for cmd in self._default_commands:
+            cmd.initialize()
 
         self.terp.reset()
 
     def execute(self):
         running = self.terp.run()
-        for sub in self.subsystems:
-            cmd = sub.getDefaultCommand()
-            # These methods are guaranteed to be here, since we import adapter above
-            if cmd is not None and not sub.has_been_marked():
-                cmd.execute()
-            sub.reset_usage_mark()
+        for pop_mark, execf in self._active_defaults:
+            if not pop_mark():
+                execf()
         if not running:
             self.complete = True
 
@@ -47,22 +63,32 @@ class AiCommand(commands2.Command):
         if interrupted:
             # otherwise (the equivalent of) stop will be called organically in "execute"
             self.terp.stop()
+        for cmd in self._default_commands:
+            cmd.end(interrupted)
+        # Subsystems without a default command aren't reset each tick, so clear every mark here
+        # to avoid leaving any set once the run is over
         for sub in self.subsystems:
-            cmd = sub.getDefaultCommand()
-            if cmd is not None:
-                cmd.end(interrupted)
+            sub.reset_usage_mark()
 
     def isFinished(self) -> bool:
         return self.complete
 
 
 def _wait_checker(args: list[ailangpy.Arg]):
-    assert len(args) == 1, "'wait' only accepts a single argument"
-    assert args[0].is_value(), "'wait' only accepts a value, not a word"
+    if len(args) != 1:
+        raise AssertionError("'wait' only accepts a single argument")
+    if not args[0].is_value():
+        raise AssertionError("'wait' only accepts a value, not a word")
 
 def _print_checker(args: list[ailangpy.Arg]):
     for (i, arg) in enumerate(args):
-        assert arg.is_value(), f"'print' does not accept words (word at {i})"
+        if not arg.is_value():
+            raise AssertionError(f"'print' does not accept words (word at {i})")
+
+# Adapters hold no per-interpreter state, so the built-in ones are shared by every interpreter
+# created with `interpreter_from_ir`
+_WAIT_ADAPTER = adapter.CommandAdapter(commands2.WaitCommand, _wait_checker)
+_PRINT_ADAPTER = adapter.CommandAdapter(commands2.PrintCommand, _print_checker)
 
 def interpreter_from_ir(ir: str) -> ailangpy.Interpreter:
     """
@@ -76,7 +102,7 @@ def interpreter_from_ir(ir: str) -> ailangpy.Interpreter:
     directly.
     """
     terp = ailangpy.Interpreter(ir)
-    terp.register_command("wait", commands2.WaitCommand, _wait_checker)
-    terp.register_command("print", commands2.PrintCommand, _print_checker)
+    terp.register_callable("wait", _WAIT_ADAPTER)
+    terp.register_callable("print", _PRINT_ADAPTER)
     return terp
 